@@ -2,9 +2,79 @@
 Configuration management for Skylens - Cesium Submission Version
 This is a redacted version showing configuration structure without sensitive values.
 """
+import logging
 import os
-from typing import Optional
-from pydantic import BaseSettings
+from collections.abc import Mapping
+from functools import cached_property, lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logger = logging.getLogger(__name__)
+
+
+class KeyVaultLookupError(KeyError):
+    """A Key Vault lookup failed (auth, network or missing SDK), as opposed to
+    the secret simply not existing. Subclasses KeyError so optional secrets
+    fall back to their defaults; security-relevant settings re-raise it."""
+
+
+class LazyKeyVaultSecrets(Mapping):
+    """
+    Read-only view of Azure Key Vault secrets, fetched on first access.
+    
+    Nothing is requested from Key Vault until a secret is looked up; each
+    result (including "not found") is memoised so every secret costs at most
+    one round-trip per process. Authentication, network or missing-SDK
+    failures are logged and raised as KeyVaultLookupError without being
+    memoised. Field names map to secret names by replacing
+    underscores with hyphens (e.g. aoai_api_key -> aoai-api-key).
+    """
+    
+    def __init__(self, vault_url: str):
+        self.vault_url = vault_url
+        self._client = None
+        self._values: Dict[str, Optional[str]] = {}
+    
+    def _get_client(self):
+        if self._client is None:
+            # Imported lazily so local development does not require the Azure SDK
+            from azure.identity import DefaultAzureCredential
+            from azure.keyvault.secrets import SecretClient
+            self._client = SecretClient(vault_url=self.vault_url, credential=DefaultAzureCredential())
+        return self._client
+    
+    def __getitem__(self, name: str) -> str:
+        if name not in self._values:
+            try:
+                from azure.core.exceptions import AzureError, ResourceNotFoundError
+                secret = self._get_client().get_secret(name.replace("_", "-"))
+                self._values[name] = secret.value
+            except ImportError:
+                logger.warning("Azure SDK not installed; skipping Key Vault lookup for %s", name)
+                raise KeyVaultLookupError(name) from None
+            except ResourceNotFoundError:
+                self._values[name] = None
+            except AzureError:
+                logger.warning("Key Vault lookup failed for %s", name, exc_info=True)
+                raise KeyVaultLookupError(name) from None
+        value = self._values[name]
+        if value is None:
+            raise KeyError(name)
+        return value
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(name for name, value in self._values.items() if value is not None)
+    
+    def __len__(self) -> int:
+        return sum(1 for value in self._values.values() if value is not None)
+
+
+@lru_cache(maxsize=None)
+def _keyvault_secrets(keyvault_name: str) -> LazyKeyVaultSecrets:
+    """Shared lazy secret view per vault, so clients and results are reused"""
+    return LazyKeyVaultSecrets(f"https://{keyvault_name}.vault.azure.net")
+
 
 class AppConfig(BaseSettings):
     """
@@ -14,6 +84,17 @@ class AppConfig(BaseSettings):
     - Reads from Azure Key Vault via managed identity
     - Falls back to environment variables for local development
     - No secrets stored in code or repository
+    
+    Precedence: init kwargs > environment > .env > Key Vault > defaults.
+    Key Vault is only consulted, lazily, for secrets not set by the earlier
+    sources, and only when a derived accessor (cors_origins, aoai_key,
+    avwx_key, has_aoai, has_avwx) is first read. Derived accessors are
+    computed once per instance and cached.
+    
+    API keys are read through aoai_key and avwx_key. The *_api_key_override
+    fields are internal: they hold only init/env/.env values (still set via
+    AOAI_API_KEY / AVWX_API_KEY) and are None when the key lives in Key Vault,
+    so they are excluded from dumps and repr and must not be read directly.
     """
     
     # CORS configuration
@@ -21,11 +102,15 @@ class AppConfig(BaseSettings):
     
     # METAR weather provider configuration
     metar_provider: str = "awc"  # Options: "awc", "avwx"
-    avwx_api_key: Optional[str] = None  # Redacted - actual: from Key Vault
+    avwx_api_key_override: Optional[str] = Field(
+        default=None, validation_alias="avwx_api_key", exclude=True, repr=False
+    )
     
     # Azure OpenAI configuration (optional)
     aoai_endpoint: Optional[str] = None  # Redacted - actual: Azure OpenAI endpoint
-    aoai_api_key: Optional[str] = None  # Redacted - actual: from Key Vault
+    aoai_api_key_override: Optional[str] = Field(
+        default=None, validation_alias="aoai_api_key", exclude=True, repr=False
+    )
     aoai_api_version: str = "2024-08-01-preview"
     aoai_deployment_chat: str = "gpt-4o"
     aoai_deployment_embed: str = "text-embedding-3-small"
@@ -39,51 +124,95 @@ class AppConfig(BaseSettings):
     # Logging configuration
     log_level: str = "INFO"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        
-        # In production, these would be loaded from Azure Key Vault
-        # via managed identity authentication
+    # Frozen so cached derivations below can never go stale via assignment
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True,
+    )
+    
+    def model_copy(self, *, update=None, deep: bool = False) -> "AppConfig":
+        """
+        Copy the configuration, optionally with field updates.
         
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+        Cached derivations live in the instance __dict__ and would otherwise
+        be carried over to the copy; they are dropped so the copy recomputes
+        them from its own field values.
+        """
+        copy = super().model_copy(update=update, deep=deep)
+        for name in _DERIVED_ACCESSORS:
+            copy.__dict__.pop(name, None)
+        return copy
+    
+    def _secret(self, field: str, required: bool = False) -> Optional[str]:
+        """
+        Resolve a secret-backed field, deferring to Key Vault when unset.
         
-        # In production: Load secrets from Azure Key Vault
-        # if self.keyvault_name:
-        #     self._load_from_keyvault()
+        Values supplied via init kwargs, environment or .env always win;
+        otherwise the secret (named after the field's alias, if any) is
+        fetched from Key Vault on first use and the declared default is used
+        if the vault has no such secret. With required=True a failed vault
+        lookup raises KeyVaultLookupError instead of falling back.
+        """
+        if field not in self.model_fields_set and self.keyvault_name:
+            name = type(self).model_fields[field].validation_alias or field
+            try:
+                return _keyvault_secrets(self.keyvault_name)[name]
+            except KeyVaultLookupError:
+                if required:
+                    raise
+            except KeyError:
+                pass
+        return getattr(self, field)
     
-    def _load_from_keyvault(self):
+    @cached_property
+    def cors_origins(self) -> Tuple[str, ...]:
         """
-        Load configuration from Azure Key Vault using managed identity.
+        Parse CORS origins from comma-separated string (immutable, shared).
         
-        This method is redacted for security - actual implementation:
-        - Uses Azure SDK with DefaultAzureCredential
-        - Loads secrets like AOAI keys, AVWX keys, CORS origins
-        - Provides fallback to environment variables
+        Raises KeyVaultLookupError if the vault is configured but cannot be
+        read: falling back to the "*" default would silently open CORS.
         """
-        pass
+        allow_origins = self._secret("allow_origins", required=True)
+        if allow_origins == "*":
+            return ("*",)
+        return tuple(origin.strip() for origin in allow_origins.split(","))
     
-    @property
-    def cors_origins(self) -> list:
-        """Parse CORS origins from comma-separated string"""
-        if self.allow_origins == "*":
-            return ["*"]
-        return [origin.strip() for origin in self.allow_origins.split(",")]
+    @cached_property
+    def aoai_key(self) -> Optional[str]:
+        """Azure OpenAI API key (environment or Key Vault)"""
+        return self._secret("aoai_api_key_override")
     
-    @property
+    @cached_property
+    def avwx_key(self) -> Optional[str]:
+        """AVWX API key (environment or Key Vault)"""
+        return self._secret("avwx_api_key_override")
+    
+    @cached_property
     def has_aoai(self) -> bool:
         """Check if Azure OpenAI is configured"""
-        return bool(self.aoai_endpoint and self.aoai_api_key)
+        return bool(self.aoai_endpoint and self.aoai_key)
     
-    @property
+    @cached_property
     def has_avwx(self) -> bool:
         """Check if AVWX weather API is configured"""
-        return bool(self.avwx_api_key)
+        return bool(self.avwx_key)
+
+# cached_property accessors on AppConfig, reset by AppConfig.model_copy
+_DERIVED_ACCESSORS = tuple(
+    name for name, value in vars(AppConfig).items() if isinstance(value, cached_property)
+)
 
-# Global configuration instance
-# In production, this loads from Azure Key Vault + environment
-config = AppConfig()
+@lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """
+    Return the process-wide configuration instance.
+    
+    Built once on first access (environment, .env and validation) and reused
+    thereafter, so imports, tests and worker reloads do not re-parse settings.
+    In production, this loads from Azure Key Vault + environment.
+    """
+    return AppConfig()
 
 # Example environment variables for local development:
 # ALLOW_ORIGINS=https://your-static-site.z33.web.core.windows.net
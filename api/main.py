@@ -2,44 +2,104 @@
 FastAPI backend for Skylens - Cesium Submission Version
 This is a redacted version showing the API structure without sensitive endpoints.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, Dict, Literal, Optional, List, Tuple, Union
+from datetime import datetime, timezone
+from cachetools import TTLCache
+import numpy as np
+import orjson
+import asyncio
 import logging
+import time
+
+try:
+    from api.config import get_config
+except ModuleNotFoundError as e:
+    if e.name != "api":
+        raise
+    # Run as a script (python api/main.py): api/ itself is on sys.path
+    from config import get_config
 
 # Redacted imports - actual implementation uses Azure Key Vault
-# from api.config import AppConfig
 # from api.services.notam_search import retrieve, generate_answer
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Skylens API",
     description="Aviation 3D visualization backend with CesiumJS integration",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes responses in C rather than via the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
-# CORS configuration - in production, restricted to static site origin
+# CORS configuration - in production, restricted to static site origin.
+# Origins are parsed once at startup and handed to the middleware as-is.
+# Set ALLOW_ORIGINS in the environment: otherwise, with KEYVAULT_NAME set,
+# this makes one blocking Key Vault lookup at import, and startup fails if
+# that lookup fails rather than falling back to allow-all.
+_ORIGINS = get_config().cors_origins
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Redacted - actual: specific Azure Static Website URL
+    allow_origins=list(_ORIGINS),
     allow_credentials=True,
     allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
 
+# Supported intent actions
+IntentAction = Literal["fly_to", "orbit", "follow", "chase", "set_layer"]
+
+# Actions whose target is an airport ICAO code
+_TARGETED_ACTIONS: frozenset[str] = frozenset(("fly_to", "orbit"))
+
 # Pydantic models for type safety
-class IntentRequest(BaseModel):
-    action: str
+# Frozen models skip assignment validation; unknown fields are rejected.
+class _IntentBase(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     target: Optional[str] = None
-    speed: Optional[float] = None
+    # Camera animation speed, bounded for safe playback
+    speed: Optional[Annotated[float, Field(ge=0.0, le=1000.0)]] = None
+
+class FlyToIntent(_IntentBase):
+    action: Literal["fly_to"]
+
+class OrbitIntent(_IntentBase):
+    action: Literal["orbit"]
+
+class FollowIntent(_IntentBase):
+    action: Literal["follow"]
+
+class ChaseIntent(_IntentBase):
+    action: Literal["chase"]
+
+class SetLayerIntent(_IntentBase):
+    action: Literal["set_layer"]
+    # e.g. "buildings:on" - matched case-insensitively (lower-cased by the handler;
+    # pydantic-core checks pattern before applying to_lower, so that cannot be used)
+    target: Annotated[str, StringConstraints(pattern=r"(?i)^buildings:(on|off)$")]
+
+# Validated entirely by Pydantic, dispatching on "action", before the handler runs
+IntentRequest = Annotated[
+    Union[FlyToIntent, OrbitIntent, FollowIntent, ChaseIntent, SetLayerIntent],
+    Field(discriminator="action")
+]
 
 class IntentResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     ok: bool
-    action: str
+    action: IntentAction
     mapped: dict
 
 class MetarResponse(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     icao: str
     raw: str
     observed: str
@@ -48,18 +108,52 @@ class MetarResponse(BaseModel):
     cache_age_sec: Optional[int] = None
 
 class NotamAnswer(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
     answer: str
     citations: List[str]
     matches: List[dict]
     provider: str
 
+class Aircraft(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
+    icaoType: str
+    registration: str
+
+class FlightSample(BaseModel):
+    """
+    Flight track as parallel arrays (one entry per sample), not a list of
+    position objects. OpenAPI schema only: /flights/sample serialises its
+    numpy payload directly and is not validated against this model.
+    """
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    
+    flightId: str
+    callsign: str
+    aircraft: Aircraft
+    times: List[str]
+    lons: List[float]
+    lats: List[float]
+    alts: List[float]
+    meta: dict
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that emits numpy arrays natively, with UTC 'Z' datetimes."""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+        )
+
 # Health check endpoint
 @app.get("/health")
 async def health():
     """Health check for Azure Container Apps"""
     return {
         "status": "ok",
-        "time": datetime.utcnow().isoformat() + "Z"
+        "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
     }
 
 # Intent validation and mapping for CesiumJS camera/layer effects
@@ -75,42 +169,58 @@ async def post_intent(request: IntentRequest):
     - chase: Camera behind moving entity
     - set_layer: Toggle layer visibility (buildings)
     """
-    try:
-        # Validate action enum
-        valid_actions = ["fly_to", "orbit", "follow", "chase", "set_layer"]
-        if request.action not in valid_actions:
-            raise HTTPException(status_code=422, detail=f"Invalid action: {request.action}")
-        
-        # Target normalization and validation
-        mapped_target = request.target
-        if request.action in ["fly_to", "orbit"]:
-            # Only EGLL supported in demo
-            if not request.target or request.target.upper() != "EGLL":
-                mapped_target = "EGLL"  # Default for demo
-        
-        elif request.action == "set_layer":
-            # Validate layer targets
-            if not request.target or not request.target.startswith("buildings:"):
-                raise HTTPException(status_code=400, detail="set_layer requires target like 'buildings:on'")
-            mapped_target = request.target.lower()
-        
-        # Speed clamping for camera animations
-        mapped_speed = None
-        if request.speed is not None:
-            mapped_speed = max(0.0, min(1000.0, float(request.speed)))
-        
-        return IntentResponse(
-            ok=True,
-            action=request.action,
-            mapped={
-                "target": mapped_target,
-                "speed": mapped_speed
-            }
-        )
+    # Action, set_layer target and speed bounds are validated by
+    # IntentRequest (422 on invalid input)
+    
+    # Target normalization
+    mapped_target = request.target
+    if request.action in _TARGETED_ACTIONS:
+        # Only EGLL supported in demo
+        if not request.target or request.target.upper() != "EGLL":
+            mapped_target = "EGLL"  # Default for demo
+    
+    elif request.action == "set_layer":
+        mapped_target = request.target.lower()
     
-    except Exception as e:
-        logging.error(f"Intent processing error: {e}")
-        raise HTTPException(status_code=500, detail="Intent processing failed")
+    return IntentResponse(
+        ok=True,
+        action=request.action,
+        mapped={
+            "target": mapped_target,
+            "speed": request.speed
+        }
+    )
+
+# METAR cache - observations are issued every 30-60 minutes, so repeated
+# polls within the window are served from memory.
+# Maps ICAO -> (response, monotonic fetch time).
+_METAR_TTL_SEC = 1800
+_metar_cache: "TTLCache[str, Tuple[MetarResponse, float]]" = TTLCache(maxsize=512, ttl=_METAR_TTL_SEC)
+# In-flight upstream fetches, so concurrent misses for one ICAO share a call
+_metar_inflight: Dict[str, "asyncio.Task[MetarResponse]"] = {}
+
+async def _fetch_metar(icao: str) -> MetarResponse:
+    """Fetch the latest METAR for an ICAO code from the upstream provider."""
+    # Redacted - actual implementation fetches from aviation weather APIs
+    # This is a demo response showing the expected structure
+    return MetarResponse(
+        icao=icao,
+        raw="EGLL 130920Z 25008KT 9999 FEW035 SCT250 12/08 Q1023 NOSIG=",
+        observed="2025-08-13T09:20:00Z",
+        provider="demo"  # Actual: "awc" or "avwx"
+    )
+
+async def _fetch_and_store_metar(icao: str) -> MetarResponse:
+    """Fetch a METAR and cache it; runs as the shared in-flight task."""
+    metar = await _fetch_metar(icao)
+    _metar_cache[icao] = (metar, time.monotonic())
+    return metar
+
+def _metar_fetch_done(icao: str, task: "asyncio.Task[MetarResponse]") -> None:
+    _metar_inflight.pop(icao, None)
+    # Retrieve failures here too, in case every waiting client has gone
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("METAR fetch failed for %s: %s", icao, task.exception())
 
 # Weather endpoint for aviation METAR data
 @app.get("/weather/metar", response_model=MetarResponse)
@@ -118,48 +228,67 @@ async def get_metar(icao: str = "EGLL"):
     """
     Fetch METAR weather data for aviation context.
     
+    Responses are cached per ICAO for _METAR_TTL_SEC; cache_hit and
+    cache_age_sec report whether the upstream provider was called.
+    
     In production:
     - Integrates with AWC (Aviation Weather Center) or AVWX APIs
-    - Implements caching with TTL
     - Provides structured weather parsing
     """
-    # Redacted - actual implementation fetches from aviation weather APIs
-    # This is a demo response showing the expected structure
-    return MetarResponse(
-        icao=icao.upper(),
-        raw="EGLL 130920Z 25008KT 9999 FEW035 SCT250 12/08 Q1023 NOSIG=",
-        observed="2025-08-13T09:20:00Z",
-        provider="demo",  # Actual: "awc" or "avwx"
-        cache_hit=False,
-        cache_age_sec=0
-    )
+    icao = icao.upper()
+    
+    cached = _metar_cache.get(icao)
+    if cached is not None:
+        metar, fetched_at = cached
+        return metar.model_copy(update={
+            "cache_hit": True,
+            "cache_age_sec": int(time.monotonic() - fetched_at)
+        })
+    
+    task = _metar_inflight.get(icao)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_and_store_metar(icao))
+        _metar_inflight[icao] = task
+        task.add_done_callback(lambda t: _metar_fetch_done(icao, t))
+    
+    # Shielded so a disconnecting client does not cancel a shared fetch;
+    # the task caches its own result either way
+    metar = await asyncio.shield(task)
+    return metar.model_copy(update={"cache_hit": False, "cache_age_sec": 0})
+
+# Sample flight data for time-dynamic entity demonstration.
+# Built once at import as parallel arrays; float32 keeps sub-metre precision
+# at these scales.
+_SAMPLE_FLIGHT = {
+    "flightId": "DEMO001",
+    "callsign": "SKYLENS1",
+    "aircraft": {
+        "icaoType": "B738",
+        "registration": "G-DEMO"
+    },
+    # Sample positions for EGLL area - actual data would be more extensive
+    "times": np.asarray(
+        ["2025-08-13T10:00:00", "2025-08-13T10:05:00", "2025-08-13T10:10:00"],  # UTC
+        dtype="datetime64[ms]"
+    ),
+    "lons": np.asarray([-0.454295, -0.450000, -0.445000], dtype=np.float32),
+    "lats": np.asarray([51.470020, 51.475000, 51.480000], dtype=np.float32),
+    "alts": np.asarray([1000, 2000, 3000], dtype=np.float32),
+    "meta": {
+        "source": "demo",
+        "duration_minutes": 10
+    }
+}
 
-# Sample flight data for time-dynamic entity demonstration
-@app.get("/flights/sample")
+@app.get("/flights/sample", response_model=None, responses={200: {"model": FlightSample}})
 async def get_sample_flight():
     """
     Provide sample flight track data for CesiumJS Entity visualization.
     
-    Returns structured flight path with timestamps for SampledPositionProperty.
+    Returns parallel times/lons/lats/alts arrays; the frontend API client
+    (getSampleFlight) zips them back into per-sample positions.
     """
-    return {
-        "flightId": "DEMO001",
-        "callsign": "SKYLENS1",
-        "aircraft": {
-            "icaoType": "B738",
-            "registration": "G-DEMO"
-        },
-        "positions": [
-            # Sample positions for EGLL area - actual data would be more extensive
-            {"time": "2025-08-13T10:00:00Z", "lon": -0.454295, "lat": 51.470020, "alt": 1000},
-            {"time": "2025-08-13T10:05:00Z", "lon": -0.450000, "lat": 51.475000, "alt": 2000},
-            {"time": "2025-08-13T10:10:00Z", "lon": -0.445000, "lat": 51.480000, "alt": 3000},
-        ],
-        "meta": {
-            "source": "demo",
-            "duration_minutes": 10
-        }
-    }
+    return NumpyORJSONResponse(_SAMPLE_FLIGHT)
 
 # NOTAM Q&A endpoint - mini-RAG implementation
 @app.get("/ai/notam", response_model=NotamAnswer)
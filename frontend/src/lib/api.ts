@@ -37,6 +37,15 @@ export type SampleFlight = {
   meta?: Record<string, unknown>;
 };
 
+// Wire format of /flights/sample: the track as parallel arrays
+// (index i of each array is one sample). Decoded into SampleFlight.
+type SampleFlightWire = Omit<SampleFlight, 'positions'> & {
+  times: string[]; // ISO8601 UTC
+  lons: number[];
+  lats: number[];
+  alts: number[];
+};
+
 const DEFAULT_BASE =
   import.meta.env.VITE_API_BASE_URL?.toString().trim() ||
   // Fallback to current deployed Container App FQDN
@@ -99,7 +108,13 @@ export async function getMetar(icao: string): Promise<MetarResponse> {
  * GET /flights/sample
  */
 export async function getSampleFlight(): Promise<SampleFlight> {
-  return get<SampleFlight>('/flights/sample');
+  const { times, lons, lats, alts, ...rest } = await get<SampleFlightWire>('/flights/sample');
+  const n = Math.min(times.length, lons.length, lats.length, alts.length);
+  const positions: SampleFlight['positions'] = new Array(n);
+  for (let i = 0; i < n; i++) {
+    positions[i] = { time: times[i], lon: lons[i], lat: lats[i], alt: alts[i] };
+  }
+  return { ...rest, positions };
 }
 
 // ===== Intent API =====
@@ -0,0 +1,120 @@
+"""Tests for AppConfig secret resolution."""
+import pytest
+from pydantic import ValidationError
+
+from api import config as config_module
+from api.config import AppConfig
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ("ALLOW_ORIGINS", "AVWX_API_KEY", "AOAI_API_KEY", "AOAI_ENDPOINT", "KEYVAULT_NAME"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def keyvault(monkeypatch):
+    secrets = {}
+    monkeypatch.setattr(config_module, "_keyvault_secrets", lambda name: secrets)
+    return secrets
+
+
+def test_avwx_key_from_keyvault_matches_has_avwx(keyvault):
+    keyvault["avwx_api_key"] = "kv-secret"
+    cfg = AppConfig(keyvault_name="kv")
+    assert cfg.has_avwx is True
+    assert cfg.avwx_key == "kv-secret"
+
+
+def test_aoai_key_from_keyvault_matches_has_aoai(keyvault):
+    keyvault["aoai_api_key"] = "kv-aoai"
+    cfg = AppConfig(keyvault_name="kv", aoai_endpoint="https://example.openai.azure.com")
+    assert cfg.has_aoai is True
+    assert cfg.aoai_key == "kv-aoai"
+
+
+def test_env_value_wins_over_keyvault(keyvault, monkeypatch):
+    keyvault["avwx_api_key"] = "kv-secret"
+    monkeypatch.setenv("AVWX_API_KEY", "env-secret")
+    cfg = AppConfig(keyvault_name="kv")
+    assert cfg.avwx_key == "env-secret"
+
+
+def test_missing_secret_falls_back_to_default(keyvault):
+    cfg = AppConfig(keyvault_name="kv")
+    assert cfg.has_avwx is False
+    assert cfg.avwx_key is None
+    assert cfg.cors_origins == ("*",)
+
+
+def test_config_is_frozen():
+    cfg = AppConfig()
+    with pytest.raises(ValidationError):
+        cfg.allow_origins = "https://z.example"
+
+
+def test_model_copy_recomputes_cached_derivations():
+    cfg = AppConfig()
+    assert cfg.cors_origins == ("*",)
+    copy = cfg.model_copy(update={"allow_origins": "https://x.example, https://y.example"})
+    assert copy.cors_origins == ("https://x.example", "https://y.example")
+    assert cfg.cors_origins == ("*",)
+
+
+def test_keyvault_failure_raises_lookup_error():
+    exceptions = pytest.importorskip("azure.core.exceptions")
+
+    class FailingClient:
+        def get_secret(self, name):
+            raise exceptions.ServiceRequestError("network down")
+
+    secrets = config_module.LazyKeyVaultSecrets("https://kv.vault.azure.net")
+    secrets._client = FailingClient()
+    with pytest.raises(config_module.KeyVaultLookupError):
+        secrets["allow_origins"]
+    # Transient failures are not memoised
+    assert "allow_origins" not in secrets._values
+
+
+def test_raw_key_fields_are_internal(keyvault, monkeypatch):
+    keyvault["avwx_api_key"] = "kv-secret"
+    monkeypatch.setenv("AOAI_API_KEY", "env-aoai")
+    cfg = AppConfig(keyvault_name="kv")
+    assert not hasattr(cfg, "avwx_api_key")
+    assert cfg.aoai_key == "env-aoai"
+    dumped = cfg.model_dump()
+    assert "avwx_api_key_override" not in dumped
+    assert "aoai_api_key_override" not in dumped
+    assert "env-aoai" not in repr(cfg)
+
+
+def test_derived_accessors_cover_every_cached_property():
+    assert set(config_module._DERIVED_ACCESSORS) == {
+        "cors_origins", "aoai_key", "avwx_key", "has_aoai", "has_avwx"
+    }
+
+
+class UnreachableVault(dict):
+    def __getitem__(self, name):
+        raise config_module.KeyVaultLookupError(name)
+
+
+def test_cors_origins_fails_when_vault_unreachable(monkeypatch):
+    monkeypatch.setattr(config_module, "_keyvault_secrets", lambda name: UnreachableVault())
+    cfg = AppConfig(keyvault_name="kv")
+    with pytest.raises(config_module.KeyVaultLookupError):
+        cfg.cors_origins
+
+
+def test_optional_keys_fall_back_when_vault_unreachable(monkeypatch):
+    monkeypatch.setattr(config_module, "_keyvault_secrets", lambda name: UnreachableVault())
+    cfg = AppConfig(keyvault_name="kv")
+    assert cfg.avwx_key is None
+    assert cfg.has_aoai is False
+
+
+def test_env_origins_skip_unreachable_vault(monkeypatch):
+    monkeypatch.setattr(config_module, "_keyvault_secrets", lambda name: UnreachableVault())
+    monkeypatch.setenv("ALLOW_ORIGINS", "https://site.example")
+    cfg = AppConfig(keyvault_name="kv")
+    assert cfg.cors_origins == ("https://site.example",)
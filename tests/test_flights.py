@@ -0,0 +1,39 @@
+"""Tests for the /flights/sample wire format."""
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def test_sample_flight_is_parallel_arrays(client):
+    response = client.get("/flights/sample")
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body) == {"flightId", "callsign", "aircraft", "times", "lons", "lats", "alts", "meta"}
+    lengths = {len(body[key]) for key in ("times", "lons", "lats", "alts")}
+    assert lengths == {3}
+
+
+def test_sample_flight_times_are_utc_iso(client):
+    times = client.get("/flights/sample").json()["times"]
+    assert times[0] == "2025-08-13T10:00:00Z"
+    assert all(isinstance(t, str) and t.endswith("Z") for t in times)
+
+
+def test_sample_flight_float32_values_round_trip(client):
+    body = client.get("/flights/sample").json()
+    assert body["lons"][0] == -0.454295
+    assert body["lats"][0] == 51.47002
+    assert body["alts"] == [1000.0, 2000.0, 3000.0]
+
+
+def test_openapi_advertises_flight_sample(client):
+    schema = client.get("/openapi.json").json()
+    content = schema["paths"]["/flights/sample"]["get"]["responses"]["200"]["content"]
+    assert content["application/json"]["schema"] == {"$ref": "#/components/schemas/FlightSample"}
+    assert "FlightSample" in schema["components"]["schemas"]
@@ -0,0 +1,56 @@
+"""Tests for /ai/intent validation and mapping."""
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def test_unknown_action_is_422(client):
+    response = client.post("/ai/intent", json={"action": "barrel_roll"})
+    assert response.status_code == 422
+
+
+def test_fly_to_non_egll_target_maps_to_egll(client):
+    response = client.post("/ai/intent", json={"action": "fly_to", "target": "KJFK"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "ok": True,
+        "action": "fly_to",
+        "mapped": {"target": "EGLL", "speed": None},
+    }
+
+
+def test_set_layer_target_is_lower_cased(client):
+    response = client.post("/ai/intent", json={"action": "set_layer", "target": "BUILDINGS:ON"})
+    assert response.status_code == 200
+    assert response.json()["mapped"]["target"] == "buildings:on"
+
+
+@pytest.mark.parametrize("body", [
+    {"action": "set_layer", "target": "buildings:maybe"},
+    {"action": "set_layer"},
+])
+def test_set_layer_invalid_target_is_422(client, body):
+    assert client.post("/ai/intent", json=body).status_code == 422
+
+
+@pytest.mark.parametrize("speed", [-1, 1001])
+def test_out_of_range_speed_is_422(client, speed):
+    response = client.post("/ai/intent", json={"action": "orbit", "speed": speed})
+    assert response.status_code == 422
+
+
+def test_max_speed_is_accepted(client):
+    response = client.post("/ai/intent", json={"action": "orbit", "speed": 1000})
+    assert response.status_code == 200
+    assert response.json()["mapped"]["speed"] == 1000.0
+
+
+def test_extra_field_is_422(client):
+    response = client.post("/ai/intent", json={"action": "follow", "target": "DEMO001", "zoom": 2})
+    assert response.status_code == 422
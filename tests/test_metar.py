@@ -0,0 +1,61 @@
+"""Tests for the METAR endpoint cache."""
+import asyncio
+
+import pytest
+
+from api import main
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    async def fake_fetch(icao):
+        calls.append(icao)
+        await asyncio.sleep(0.01)
+        return main.MetarResponse(icao=icao, raw=f"{icao} RAW", observed="2025-08-13T09:20:00Z", provider="test")
+
+    main._metar_cache.clear()
+    main._metar_inflight.clear()
+    monkeypatch.setattr(main, "_fetch_metar", fake_fetch)
+    yield calls
+    main._metar_cache.clear()
+    main._metar_inflight.clear()
+
+
+def test_second_call_is_cache_hit_with_age(fetches, monkeypatch):
+    first = asyncio.run(main.get_metar("egll"))
+    assert first.icao == "EGLL"
+    assert first.cache_hit is False
+    assert first.cache_age_sec == 0
+
+    real_monotonic = main.time.monotonic
+    monkeypatch.setattr(main.time, "monotonic", lambda: real_monotonic() + 120)
+    second = asyncio.run(main.get_metar("EGLL"))
+    assert second.cache_hit is True
+    assert second.cache_age_sec >= 120
+    assert fetches == ["EGLL"]
+
+
+def test_concurrent_misses_share_one_fetch(fetches):
+    async def poll():
+        return await asyncio.gather(*(main.get_metar("EGLC") for _ in range(5)))
+
+    results = asyncio.run(poll())
+    assert fetches == ["EGLC"]
+    assert all(r.cache_hit is False for r in results)
+    assert "EGLC" in main._metar_cache
+    assert not main._metar_inflight
+
+
+def test_result_cached_when_waiter_cancelled(fetches):
+    async def cancel_waiter():
+        waiter = asyncio.ensure_future(main.get_metar("EGKK"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.05)
+
+    asyncio.run(cancel_waiter())
+    assert "EGKK" in main._metar_cache